@@ -1,12 +1,25 @@
-from collections import OrderedDict
 from utils import Level  # base Level class
 
+# Integer codes for the eviction policies, resolved once when a cache level is built
+_FIFO, _LRU, _MRU = 0, 1, 2
+_POLICY_CODES = {"FIFO": _FIFO, "LRU": _LRU, "MRU": _MRU}
+
 class CacheLevel(Level):
     """
     This is a write-back, write-allocate cache that uses FIFO, LRU, or MRU for eviction.
     It supports connecting to higher and lower cache levels for simulation.
     """
 
+    # Level itself has no __slots__, so its name and counters still live in __dict__;
+    # the higher_level/lower_level properties keep the topology links in slots
+    __slots__ = ("size", "block_size", "associativity", "eviction_policy",
+                 "num_sets", "offsets", "index", "cache",
+                 "_rh", "_rm", "_rw", "_re",
+                 "_block_mask", "_index_mask", "_tag_shift",
+                 "access", "_select_victim_tag", "_last_block",
+                 "_higher_level", "_lower_level",
+                 "_higher_access", "_lower_is_dirty", "_lower_invalidate")
+
     def __init__(self, size, block_size, associativity,
                  eviction_policy, write_policy,
                  level_name, higher_level=None, lower_level=None):
@@ -16,38 +29,80 @@ class CacheLevel(Level):
         self.block_size = block_size
         self.associativity = associativity
         self.eviction_policy = eviction_policy.upper()
-        self.write_policy = write_policy.upper()
+        # write_policy is accepted for config compatibility; every level is modeled as write-back
 
         self.num_sets = self.size // (self.block_size * self.associativity)
         self.offsets = (self.block_size).bit_length() - 1
         self.index = (self.num_sets).bit_length() - 1
 
-        # One OrderedDict for each set, keeping blocks with tags and dirty info
-        self.cache = [OrderedDict() for _ in range(self.num_sets)]
+        # Bound reporting methods, looked up once instead of on every access
+        self._rh = self.report_hit
+        self._rm = self.report_miss
+        self._rw = self.report_writeback
+        self._re = self.report_eviction
+
+        # Precomputed masks and shifts so the hot path decodes addresses inline
+        self._block_mask = ~(self.block_size - 1)
+        self._index_mask = self.num_sets - 1
+        self._tag_shift = self.index + self.offsets
+
+        # One dict for each set, mapping each block's tag to its dirty bit.
+        # Dicts preserve insertion order, so the first key is the oldest block.
+        self.cache = [{} for _ in range(self.num_sets)]
+
+        # Block address of the last R/W access, still resident (and newest for LRU/MRU)
+        self._last_block = -1
+
+        # The policy is fixed, so bind the matching access and victim methods once
+        pol = _POLICY_CODES.get(self.eviction_policy)
+        if pol is None:
+            raise ValueError(f'Invalid eviction policy for {level_name}: {eviction_policy}')
+        self.access = self._access_fifo if pol == _FIFO else self._access_recency
+        self._select_victim_tag = self._newest_tag if pol == _MRU else self._oldest_tag
+
+    @property
+    def higher_level(self):
+        return self._higher_level
+
+    @higher_level.setter
+    def higher_level(self, level):
+        # The hierarchy is wired after construction, so rebind the remote method on every change
+        self._higher_level = level
+        self._higher_access = level.access if level else None
+
+    @property
+    def lower_level(self):
+        return self._lower_level
+
+    @lower_level.setter
+    def lower_level(self, level):
+        # Same as higher_level: keep the bound lower-level methods in sync with the link
+        self._lower_level = level
+        self._lower_is_dirty = level.is_dirty if level else None
+        self._lower_invalidate = level.invalidate if level else None
 
     def _calc_index(self, address: int) -> int:
         # This function gets the cache set index from the address.
-        return (address >> self.offsets) & (self.num_sets - 1)
+        return (address >> self.offsets) & self._index_mask
 
     def _calc_tag(self, address: int) -> int:
         # This function gets the tag from the address.
-        return address >> (self.index + self.offsets)
+        return address >> self._tag_shift
 
     def _block_align(self, address: int) -> int:
         # This function removes the offset bits to get the block-aligned address.
-        return address & ~(self.block_size - 1)
+        return address & self._block_mask
 
     def _addr_from_tag_index(self, tag: int, set_index: int) -> int:
         # This function reconstructs the block address from tag and index.
-        return (tag << (self.index + self.offsets)) | (set_index << self.offsets)
+        return (tag << self._tag_shift) | (set_index << self.offsets)
 
     def is_dirty(self, address):
         # This function checks if the block at the given address is marked dirty.
-        block_addr = self._block_align(address)
-        set_index = self._calc_index(block_addr)
-        tag = self._calc_tag(block_addr)
-        block_info = self.cache[set_index].get(tag)
-        return block_info["dirty"] if block_info else False
+        block_addr = address & self._block_mask
+        set_index = (block_addr >> self.offsets) & self._index_mask
+        tag = block_addr >> self._tag_shift
+        return self.cache[set_index].get(tag, False)
 
     def has_block(self, address: int) -> bool:
         # This function checks if the block exists in the cache.
@@ -56,67 +111,104 @@ class CacheLevel(Level):
         tag = self._calc_tag(block_addr)
         return tag in self.cache[set_index]
 
-    def _update_recency(self, set_index, tag):
-        # This function updates the usage order of a block for LRU or MRU.
-        self.cache[set_index].move_to_end(tag)
+    def _oldest_tag(self, set_index):
+        # This function picks the oldest block in the set (FIFO and LRU victim).
+        cache_set = self.cache[set_index]
+        return next(iter(cache_set)) if cache_set else None
 
-    def _select_victim_tag(self, set_index) -> int:
-        # This function chooses which block to evict based on the policy.
-        if not self.cache[set_index]:
-            return None
-        if self.eviction_policy in ("FIFO", "LRU"):
-            return next(iter(self.cache[set_index]))  # oldest one
-        elif self.eviction_policy == "MRU":
-            return next(reversed(self.cache[set_index]))  # newest one
+    def _newest_tag(self, set_index):
+        # This function picks the newest block in the set (MRU victim).
+        cache_set = self.cache[set_index]
+        return next(reversed(cache_set)) if cache_set else None
 
-    def access(self, operation, address):
+    def _access_fifo(self, operation, address):
         """
-        This function handles access to the cache:
+        This function handles access to a FIFO cache:
         'R' = read, 'W' = write, 'B' = write-back (dirty block).
+        Hits never change the insertion order of the set.
         """
-        block_addr = self._block_align(address)
-        set_index = self._calc_index(block_addr)
-        tag = self._calc_tag(block_addr)
+        block_addr = address & self._block_mask
+
+        # Reading the last accessed block again is a hit that changes nothing
+        if block_addr == self._last_block and operation == 'R':
+            self._rh('R', address)
+            return
+
+        set_index = (block_addr >> self.offsets) & self._index_mask
+        tag = block_addr >> self._tag_shift
+        cache_set = self.cache[set_index]
 
         # Handle write-back (B) first
         if operation == 'B':
-            if tag not in self.cache[set_index]:
-                self.cache[set_index][tag] = {"dirty": True}
-            else:
-                self.cache[set_index][tag]["dirty"] = True
-            self.report_hit("B", address)
+            cache_set[tag] = True
+            self._rh("B", address)
             return
 
         # Handle hit case
-        if tag in self.cache[set_index]:
-            self.report_hit(operation, address)
-            if operation == 'W' and self.lower_level is None:
-                self.cache[set_index][tag]["dirty"] = True
-            if self.eviction_policy in ("LRU", "MRU"):
-                self._update_recency(set_index, tag)
+        if tag in cache_set:
+            self._rh(operation, address)
+            if operation == 'W' and self._lower_level is None:
+                cache_set[tag] = True
+        # Handle miss case
+        else:
+            self._fill(operation, address, block_addr, set_index, tag, cache_set)
+        self._last_block = block_addr
+
+    def _access_recency(self, operation, address):
+        """
+        This function handles access to an LRU or MRU cache:
+        'R' = read, 'W' = write, 'B' = write-back (dirty block).
+        Hits move the block to the newest end of the set.
+        """
+        block_addr = address & self._block_mask
+
+        # Reading the last accessed block again is a hit that changes nothing
+        if block_addr == self._last_block and operation == 'R':
+            self._rh('R', address)
+            return
+
+        set_index = (block_addr >> self.offsets) & self._index_mask
+        tag = block_addr >> self._tag_shift
+        cache_set = self.cache[set_index]
+
+        # Handle write-back (B) first
+        if operation == 'B':
+            # A newly inserted block becomes the newest key, so the last block may no longer be
+            self._last_block = -1
+            cache_set[tag] = True
+            self._rh("B", address)
+            return
+
+        # Handle hit case; one pop both finds the block and unlinks it from the order
+        dirty = cache_set.pop(tag, None)
+        if dirty is not None:
+            self._rh(operation, address)
+            # Re-inserting the tag makes it the newest key in the set
+            cache_set[tag] = dirty or (operation == 'W' and self._lower_level is None)
         # Handle miss case
         else:
-            self.report_miss(operation, address)
+            self._fill(operation, address, block_addr, set_index, tag, cache_set)
+        self._last_block = block_addr
 
-            # Evict if the set is full
-            if len(self.cache[set_index]) >= self.associativity:
-                self.evict(set_index)
+    def _fill(self, operation, address, block_addr, set_index, tag, cache_set):
+        # This function handles a miss: it makes room, fetches the block and inserts it.
+        self._rm(operation, address)
 
-            # Ask the higher level to get the block
-            if self.higher_level:
-                self.higher_level.access('R', address)
+        # Evict if the set is full
+        if len(cache_set) >= self.associativity:
+            self.evict(set_index)
 
-            # Add the block to cache
-            self.cache[set_index][tag] = {"dirty": False}
+        # Ask the higher level to get the block
+        if self._higher_access:
+            self._higher_access('R', address)
 
-            # Set dirty if it's a write and no lower level
-            if self.lower_level is None:
-                if operation == 'W':
-                    self.cache[set_index][tag]["dirty"] = True
-            else:
-                # If lower level has dirty block, mark this one dirty too
-                if self.lower_level.has_block(block_addr) and self.lower_level.is_dirty(block_addr):
-                    self.cache[set_index][tag]["dirty"] = True
+        # Add the block to cache, dirty if it's a write and no lower level
+        if self._lower_level is None:
+            cache_set[tag] = operation == 'W'
+        else:
+            # If lower level has dirty block, mark this one dirty too
+            # (is_dirty is False for absent blocks, so no separate has_block probe)
+            cache_set[tag] = self._lower_is_dirty(block_addr)
 
     def evict(self, set_index):
         # This function removes a block from a full set based on the eviction policy.
@@ -125,34 +217,46 @@ class CacheLevel(Level):
             return
         victim_addr = self._addr_from_tag_index(victim_tag, set_index)
 
-        # Invalidate in lower level first (if inclusive)
-        if self.lower_level and self.lower_level.has_block(victim_addr):
-            self.lower_level.invalidate(victim_addr, skip_lower_levels=False)
+        # Invalidate in lower levels first (if inclusive); this stops at the first level without it
+        if self._lower_invalidate:
+            self._lower_invalidate(victim_addr, skip_lower_levels=False)
 
-        # Then remove from this cache
-        self.invalidate(victim_addr, skip_lower_levels=True)
+        # Then remove from this cache, reusing the already known set index and tag
+        self._invalidate_block(set_index, victim_tag, victim_addr)
 
     def invalidate(self, address, skip_lower_levels=False):
         # This function deletes a block from cache, and writes it back if dirty.
-        block_addr = self._block_align(address)
-        set_index = self._calc_index(block_addr)
-        tag = self._calc_tag(block_addr)
+        # Lower levels are walked in a loop rather than by recursive calls.
+        level = self
+        while level is not None:
+            block_addr = address & level._block_mask
+            set_index = (block_addr >> level.offsets) & level._index_mask
+            tag = block_addr >> level._tag_shift
+            if not level._invalidate_block(set_index, tag, block_addr):
+                return
 
-        block_info = self.cache[set_index].get(tag)
-        if block_info is None:
-            return
+            # Handle invalidation in lower levels if needed, using this level's aligned address
+            if skip_lower_levels:
+                return
+            address = block_addr
+            level = level._lower_level
+
+    def _invalidate_block(self, set_index, tag, block_addr):
+        # This function removes an already decoded block from this level only.
+        # It returns whether the block was present.
+        # Remove the block and fetch its dirty bit in a single dict operation
+        dirty = self.cache[set_index].pop(tag, None)
+        if dirty is None:
+            return False
+        if block_addr == self._last_block:
+            self._last_block = -1
 
         # Critical: first handle dirty data and do writeback before eviction reporting
-        if block_info["dirty"]:
-            self.report_writeback(block_addr)
-            if self.higher_level:
-                self.higher_level.access('B', block_addr)
-            block_info["dirty"] = False
-
-        # Only after writeback, remove block and report eviction
-        del self.cache[set_index][tag]
-        self.report_eviction(block_addr)
-
-        # Handle invalidation in lower levels if needed
-        if not skip_lower_levels and self.lower_level:
-            self.lower_level.invalidate(block_addr, skip_lower_levels=False)
\ No newline at end of file
+        if dirty:
+            self._rw(block_addr)
+            if self._higher_access:
+                self._higher_access('B', block_addr)
+
+        # Only after writeback, report eviction
+        self._re(block_addr)
+        return True